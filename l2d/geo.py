@@ -35,7 +35,6 @@
 
 import os
 import tempfile
-import commands
 import shutil
 import subprocess
 import json
@@ -55,8 +54,9 @@ def translate(filename, srs):
     f = open(prjfile, 'w')
     f.write(srs)
     f.close()
-    cmd = 'ogr2ogr %s %s -t_srs %s' % (fout, filename, prjfile)
-    result = commands.getstatusoutput(cmd)
+    cmd = ['ogr2ogr', fout, filename, '-t_srs', prjfile]
+    with open(os.devnull, 'w') as devnull:
+        subprocess.call(cmd, stdout=devnull, stderr=subprocess.STDOUT)
     return fout
 
 
@@ -70,8 +70,9 @@ def crop2vector(img, vector):
     mask = gippy.GeoImage(os.path.join(td, vector.LayerName()), img, gippy.GDT_Byte, 1)
     maskname = mask.Filename()
     mask = None
-    cmd = 'gdal_rasterize -at -burn 1 -l %s %s %s' % (warped_vec.LayerName(), vecname, maskname)
-    result = commands.getstatusoutput(cmd)
+    cmd = ['gdal_rasterize', '-at', '-burn', '1', '-l', warped_vec.LayerName(), vecname, maskname]
+    with open(os.devnull, 'w') as devnull:
+        subprocess.call(cmd, stdout=devnull, stderr=subprocess.STDOUT)
     mask = gippy.GeoImage(maskname)
     img.AddMask(mask[0]).Process().ClearMasks()
     mask = None
@@ -80,18 +81,39 @@ def crop2vector(img, vector):
     return img
 
 
+# cache of LAS file bounding boxes - each lookup costs a 'pdal info' run
+_las_bounds_cache = {}
+
+
+def _cached_bounds(filename):
+    """ Bounding box of a LAS file, cached across calls """
+    if filename not in _las_bounds_cache:
+        _las_bounds_cache[filename] = get_bounds(filename)
+    return _las_bounds_cache[filename]
+
+
 def check_overlap(filenames, vector):
     """ Return filtered list of filenames that intersect with vector """
     sitegeom = loads(vector.WKT())
-    goodf = []
+    boxes = []
     for f in filenames:
         try:
-            bbox = get_bounds(f)
-            if sitegeom.intersection(bbox).area > 0:
-                goodf.append(f)
+            boxes.append((f, _cached_bounds(f)))
         except:
             pass
-    return goodf
+    try:
+        from rtree import index
+    except ImportError:
+        index = None
+    if index is not None and len(boxes) > 1:
+        # query an R-tree over the file envelopes so only candidates near
+        # the site are intersected, instead of every file
+        idx = index.Index()
+        for i, (f, bbox) in enumerate(boxes):
+            idx.insert(i, bbox.bounds)
+        hits = set(idx.intersection(sitegeom.bounds))
+        boxes = [b for i, b in enumerate(boxes) if i in hits]
+    return [f for f, bbox in boxes if sitegeom.intersection(bbox).area > 0]
 
 
 def get_meta_data(filename):
@@ -73,11 +73,11 @@ class l2dParser(argparse.ArgumentParser):
         parser = self.get_parser()
         group = parser.add_argument_group('input options')
         group.add_argument('lasdir', help='Directory of LAS file(s) to process')
-	group.add_argument(
-	    '--vendor_classified', 
-	    help='Files are not classified by l2d, the l2d naming scheme was not used for classified files', default=False)
-    	group.add_argument('--slope', help='Slope (override)', default=None)
-    	group.add_argument('--cellsize', help='Cell Size (override)', default=None)
+        group.add_argument(
+            '--vendor_classified',
+            help='Files are not classified by l2d, the l2d naming scheme was not used for classified files', default=False)
+        group.add_argument('--slope', help='Slope (override)', default=None)
+        group.add_argument('--cellsize', help='Cell Size (override)', default=None)
         group.add_argument('-r', '--radius', help='Create DEM or each provided radius', nargs='*', default=['0.56'])
         group.add_argument('-s', '--site', help='Shapefile of site(s) in same projection as LiDAR', default=None)
         group.add_argument('-v', '--verbose', help='Print additional info', default=False, action='store_true')
@@ -95,6 +95,9 @@ class l2dParser(argparse.ArgumentParser):
         group.add_argument(
             '-o', '--overwrite', default=False, action='store_true',
             help='Overwrite any existing output files')
+        group.add_argument(
+            '--jobs', default=1, type=int,
+            help='Number of parallel jobs to use when gridding LAS files')
         self.parent_parsers.append(parser)
 
     def add_filter_parser(self):
@@ -32,14 +32,18 @@
 
 import os
 import json as jsonlib
+import logging
 import tempfile
 
 from shapely.wkt import loads
 import glob
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
 import uuid
 from .utils import class_params, class_suffix, dem_products, gap_fill
 
+log = logging.getLogger(__name__)
+
 
 """ JSON Functions """
 
@@ -56,7 +60,7 @@ def _json_gdal_base(fout, output, radius, resolution=1, site=None):
     if len(output) > 1:
         # TODO: we might want to create a multiband raster with max/min/idw
         # in the future
-        print "More than 1 output, will only create {0}".format(output[0])
+        log.info("More than 1 output, will only create {0}".format(output[0]))
         output = [output[0]]
 
     json['pipeline'].insert(0, {
@@ -195,7 +199,7 @@ def _json_add_readers(json, filenames):
 
 def _json_print(json):
     """ Pretty print JSON """
-    print jsonlib.dumps(json, indent=4, separators=(',', ': '))
+    log.info(jsonlib.dumps(json, indent=4, separators=(',', ': ')))
 
 
 """ Run PDAL commands """
@@ -208,8 +212,8 @@ def run_pipeline(json, verbose=False):
     # write to temp file
     f, jsonfile = tempfile.mkstemp(suffix='.json')
     if verbose:
-        print 'Pipeline file: %s' % jsonfile
-    os.write(f, jsonlib.dumps(json))
+        log.info('Pipeline file: %s' % jsonfile)
+    os.write(f, jsonlib.dumps(json).encode('utf8'))
     os.close(f)
 
     cmd = [
@@ -244,11 +248,10 @@ def run_pdalground(fin, fout, slope, cellsize, maxWindowSize, maxDistance, appro
 
     if verbose:
         cmd.append('--developer-debug')
-        print ' '.join(cmd)
-    print ' '.join(cmd)
+    log.info(' '.join(cmd))
     out = os.system(' '.join(cmd))
     if verbose:
-        print out
+        log.info(out)
 
 
 # LiDAR Classification and DEM creation
@@ -274,7 +277,7 @@ def merge_files(filenames, fout=None, site=None, buff=20, decimation=None, verbo
         run_pipeline(json, verbose=verbose)
     except:
         raise Exception("Error merging LAS files")
-    print 'Created merged file %s in %s' % (os.path.relpath(fout), datetime.now() - start)
+    log.info('Created merged file %s in %s' % (os.path.relpath(fout), datetime.now() - start))
     return fout
 
 
@@ -283,7 +286,7 @@ def classify(filenames, fout, slope=None, cellsize=None, maxWindowSize=10, maxDi
     """ Classify files and output single las file """
     start = datetime.now()
 
-    print 'Classifying %s files into %s' % (len(filenames), os.path.relpath(fout))
+    log.info('Classifying %s files into %s' % (len(filenames), os.path.relpath(fout)))
 
     # problem using PMF in JSON - instead merge to ftmp and run 'pdal ground'
     ftmp = merge_files(filenames, site=site, buff=buff, decimation=decimation, verbose=verbose)
@@ -299,18 +302,31 @@ def classify(filenames, fout, slope=None, cellsize=None, maxWindowSize=10, maxDi
         # remove temp file
         os.remove(ftmp)
 
-    print 'Created %s in %s' % (os.path.relpath(fout), datetime.now() - start)
+    log.info('Created %s in %s' % (os.path.relpath(fout), datetime.now() - start))
     return fout
 
 
+def _create_dem_radius(args):
+    """ Run create_dem for a single radius (thread pool worker) """
+    filenames, demtype, rad, kwargs = args
+    return create_dem(filenames, demtype, radius=rad, **kwargs)
+
+
 def create_dems(filenames, demtype, radius=['0.56'], site=None, gapfill=False,
-                outdir='', suffix='', overwrite=False, resolution=0.1, **kwargs):
+                outdir='', suffix='', overwrite=False, resolution=0.1, jobs=1, **kwargs):
     """ Create DEMS for multiple radii, and optionally gapfill """
-    fouts = []
-    for rad in radius:
-        fouts.append(
-            create_dem(filenames, demtype,
-                       radius=rad, site=site, outdir=outdir, suffix=suffix, overwrite=overwrite, resolution=resolution, **kwargs))
+    kw = dict(site=site, outdir=outdir, suffix=suffix, overwrite=overwrite,
+              resolution=resolution, **kwargs)
+    if jobs > 1 and len(radius) > 1:
+        # each radius is an independent DEM whose time is spent in a pdal
+        # subprocess, so threads grid the radii truly in parallel
+        pool = ThreadPool(min(jobs, len(radius)))
+        try:
+            fouts = pool.map(_create_dem_radius, [(filenames, demtype, rad, kw) for rad in radius])
+        finally:
+            pool.close()
+    else:
+        fouts = [create_dem(filenames, demtype, radius=rad, **kw) for rad in radius]
     fnames = {}
     # convert from list of dicts, to dict of lists
     for product in fouts[0].keys():
@@ -362,7 +378,7 @@ def create_dem(filenames, demtype, radius='0.56', site=None, decimation=None,
             run = True
 
     if run or overwrite:
-        print 'Creating %s from %s files' % (prettyname, len(filenames))
+        log.info('Creating %s from %s files' % (prettyname, len(filenames)))
         # JSON pipeline
         json = _json_gdal_base(bname, products, radius, resolution)
 
@@ -388,5 +404,5 @@ def create_dem(filenames, demtype, radius='0.56', site=None, decimation=None,
         if not exists:
             raise Exception("Error creating dems: %s" % ' '.join(fouts))
 
-    print 'Completed %s in %s' % (prettyname, datetime.now() - start)
+    log.info('Completed %s in %s' % (prettyname, datetime.now() - start))
     return fouts
@@ -34,10 +34,13 @@ Create Canopy Height model from a DSM and DTM
 
 import os
 import argparse
+import logging
 import datetime as dt
 from l2d.utils import create_chm, create_hillshade, create_vrt
 import gippy
 
+log = logging.getLogger(__name__)
+
 
 def main():
     dhf = argparse.ArgumentDefaultsHelpFormatter
@@ -66,8 +69,10 @@ def main():
         help='Print additional info')
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     start = dt.datetime.now()
-    print 'Creating CHM from DEMS in %s' % (os.path.relpath(args.demdir))
+    log.info('Creating CHM from DEMS in %s' % (os.path.relpath(args.demdir)))
 
     if args.site is not None:
         site = gippy.GeoVector(args.site)
@@ -83,16 +88,16 @@ def main():
         fdtm = prefix + args.dtm
         fdsm = prefix + args.dsm
         if not os.path.exists(fdtm) or not os.path.exists(fdsm):
-            print "No valid input files found (%s)" % prefix
+            log.info("No valid input files found (%s)" % prefix)
             continue
         try:
             fout = create_chm(fdtm, fdsm, prefix + args.fout)
             fouts.append(fout)
         except Exception as e:
-            print "Error creating %s: %s" % (fout, e)
+            log.error("Error creating %s: %s" % (fout, e))
             if args.verbose:
                 import traceback
-                print traceback.format_exc()
+                log.error(traceback.format_exc())
 
         if args.hillshade:
             hillfouts.append(create_hillshade(fout))
@@ -104,7 +109,7 @@ def main():
             fout = os.path.splitext(fout_final)[0] + '_hillshade.tif'
             create_vrt(hillfouts, fout, site=site)
 
-    print 'Completed %s in %s' % (fout_final, dt.datetime.now() - start)
+    log.info('Completed %s in %s' % (fout_final, dt.datetime.now() - start))
 
 
 if __name__ == "__main__":
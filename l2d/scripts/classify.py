@@ -34,11 +34,14 @@ Calls `pdal ground` for all provided filenames and creates new las file output w
 
 import os
 import argparse
+import logging
 from datetime import datetime
 from l2d.utils import find_lasfiles, get_classification_filename, class_params
 from l2d.pdal import classify
 import gippy
 
+log = logging.getLogger(__name__)
+
 
 def main():
     dhf = argparse.ArgumentDefaultsHelpFormatter
@@ -63,6 +66,8 @@ def main():
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     start = datetime.now()
 
     if not os.path.exists(args.outdir):
@@ -88,13 +93,13 @@ def main():
                                 site=feature, buff=args.buff,
                                 decimation=args.decimation, approximate=args.approximate, verbose=args.verbose)
             except Exception as e:
-                print "Error creating %s: %s" % (os.path.relpath(fout), e)
+                log.error("Error creating %s: %s" % (os.path.relpath(fout), e))
                 if args.verbose:
                     import traceback
-                    print traceback.format_exc()
+                    log.error(traceback.format_exc())
         fouts.append(fout)
 
-    print 'l2d_classify completed in %s' % (datetime.now() - start)
+    log.info('l2d_classify completed in %s' % (datetime.now() - start))
 
 
 if __name__ == '__main__':
@@ -33,12 +33,22 @@ Creates density image of all files
 """
 
 import os
+import logging
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
 from l2d.pdal import create_dems
 from l2d.utils import find_lasfiles, find_classified_lasfile, dem_products, class_params, create_vrt
 from l2d.parsers import l2dParser
 from gippy import GeoVector
 
+log = logging.getLogger(__name__)
+
+
+def _create_dems_shard(shard):
+    """ Run create_dems on a subset of the LAS files (thread pool worker) """
+    lasfiles, demtype, feature, gapfill, kwargs = shard
+    return create_dems(lasfiles, demtype, site=feature, gapfill=gapfill, **kwargs)
+
 
 def main():
     parser = l2dParser(description='Create DEM(s) from LiDAR files', commands=True)
@@ -50,6 +60,8 @@ def main():
 #	default=False)
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     start0 = datetime.now()
 
     lasdir = args.lasdir
@@ -59,7 +71,7 @@ def main():
         try:
             site = GeoVector(args.site)
         except:
-            print 'Error opening %s' % args.site
+            log.error('Error opening %s' % args.site)
             exit(2)
     else:
         site = [None]
@@ -79,48 +91,67 @@ def main():
 
     # pull out the arguments to pass to create_dems
     keys = ['radius', 'decimation', 'maxsd', 'maxz', 'maxangle', 'returnnum',
-            'outdir', 'suffix', 'verbose', 'overwrite', 'resolution']
+            'outdir', 'suffix', 'verbose', 'overwrite', 'resolution', 'jobs']
     vargs = vars(args)
     kwargs = {k: vargs[k] for k in vargs if k in keys}
 
     # run if any products are missing
     exists = all([os.path.exists(f) for f in fouts.values()])
     if exists and not args.overwrite:
-        print 'Already created %s in %s' % (args.demtype, os.path.relpath(args.outdir))
+        log.info('Already created %s in %s' % (args.demtype, os.path.relpath(args.outdir)))
         exit(0)
 
     # loop through features
     pieces = []
     for feature in site:
         try:
-	    # find las files
-	    if args.demtype == 'density':
-	        lasfiles = find_lasfiles(args.lasdir, site=feature, checkoverlap=True)
-  	    else:
-		if args.vendor_classified == False:
-		    parameters = class_params(feature, args.slope, args.cellsize)
-	            lasfiles = find_classified_lasfile(args.lasdir, site=feature, params=parameters)
-		else:
-		    lasfiles = find_lasfiles(args.lasdir, site=feature, checkoverlap=True)
-	    # create dems
-	    pouts = create_dems(lasfiles, args.demtype, site=feature, gapfill=args.gapfill, **kwargs)
-	    # NOTE - if gapfill then fouts is dict, otherwise is list of dicts (1 for each radius)
-	    pieces.append(pouts)
-        except Exception, e:
-	    print "Error creating %s %s: %s" % (args.demtype, '' if feature is None else feature.Basename(), e)
-	    if args.verbose:
-	        import traceback
-	        print traceback.format_exc()
+            # find las files
+            if args.demtype == 'density':
+                lasfiles = find_lasfiles(args.lasdir, site=feature, checkoverlap=True)
+            else:
+                if args.vendor_classified == False:
+                    parameters = class_params(feature, args.slope, args.cellsize)
+                    lasfiles = find_classified_lasfile(args.lasdir, site=feature, params=parameters)
+                else:
+                    lasfiles = find_lasfiles(args.lasdir, site=feature, checkoverlap=True)
+            # create dems
+            if args.jobs > 1 and args.gapfill:
+                # gap filling interpolates each raster to complete coverage, so
+                # running it per shard would fill across the other shards' tiles
+                # and hide their data when the VRT composites the results
+                log.warning('Gapfill must run on the merged result - gridding LAS files sequentially')
+            if args.jobs > 1 and len(lasfiles) > 1 and not args.gapfill:
+                # shard files across a thread pool - the gridding is done in pdal
+                # subprocesses so threads run the shards truly in parallel
+                njobs = min(args.jobs, len(lasfiles))
+                # shards already use the jobs, so do not also parallelize radii
+                shards = [(lasfiles[j::njobs], args.demtype, feature, args.gapfill,
+                           dict(kwargs, suffix='%s_j%s' % (args.suffix, j), jobs=1)) for j in range(njobs)]
+                pool = ThreadPool(njobs)
+                try:
+                    # shard outputs are combined into the product VRTs below
+                    pieces.extend(pool.map(_create_dems_shard, shards))
+                finally:
+                    pool.close()
+            else:
+                pouts = create_dems(lasfiles, args.demtype, site=feature, gapfill=args.gapfill, **kwargs)
+                # NOTE - if gapfill then fouts is dict, otherwise is list of dicts (1 for each radius)
+                pieces.append(pouts)
+        except Exception as e:
+            log.error("Error creating %s %s: %s" % (args.demtype, '' if feature is None else feature.Basename(), e))
+            if args.verbose:
+                import traceback
+                log.error(traceback.format_exc())
 
     # combine all features into single file and align to site
     for product in products:
         # there will be mult if gapfill False and multiple radii....use 1st one
         fnames = [piece[product] for piece in pieces]
         if len(fnames) > 0:
-	    create_vrt(fnames, fouts[product], site=site)
+            create_vrt(fnames, fouts[product], site=site)
 
 
-    print 'l2d_dems %s completed (%s) in %s' % (args.demtype, os.path.relpath(args.outdir), datetime.now() - start0)
+    log.info('l2d_dems %s completed (%s) in %s' % (args.demtype, os.path.relpath(args.outdir), datetime.now() - start0))
 
 
 if __name__ == '__main__':
@@ -11,6 +11,7 @@
 Creates raster of transformed relative density models for declared region of interest
 """
 
+import logging
 from datetime import datetime
 import argparse
 from osgeo import gdal
@@ -52,6 +53,8 @@ def main():
         help='Print additional info')
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     start0 = datetime.now()
 
     #variables describing region of interest and scale
@@ -33,6 +33,7 @@ Creates raster of return or intensity counts in cubic meter voxels
 """
 
 import os
+import logging
 from datetime import datetime
 import argparse
 from l2d.voxel_utils import create_voxels
@@ -69,6 +70,8 @@ def main():
         help='Print additional info')
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     start0 = datetime.now()
 
     # open site vector
@@ -32,14 +32,16 @@
 
 
 import os
-import sys
 import glob
+import logging
 from datetime import datetime
 import gippy
 from gippy.algorithms import CookieCutter
 import numpy
 from .geo import check_overlap, get_vector_bounds
 
+log = logging.getLogger(__name__)
+
 
 # File utilities
 
@@ -98,25 +100,55 @@ def class_suffix(slope, cellsize, suffix=''):
     return '%sl2d_s%sc%s.las' % (suffix, slope, cellsize)
 
 
+# cache of LAS file searches - globbing stats every matching entry, and the
+# overlap check reads every file header, so avoid repeating either when
+# called again for the same directory and site (e.g. once per radius)
+_lasfile_cache = {}
+
+
 def find_lasfiles(lasdir='', site=None, checkoverlap=False):
     """" Find lasfiles intersecting with site """
-    filenames = glob.glob(os.path.join(lasdir, '*.las'))
-    if checkoverlap and site is not None:
-        filenames = check_overlap(filenames, site)
-    if len(filenames) == 0:
-        raise Exception("No LAS files found")
-    return filenames
+    key = (os.path.abspath(lasdir), None if site is None else site.Basename(), checkoverlap)
+    if key not in _lasfile_cache:
+        filenames = glob.glob(os.path.join(lasdir, '*.las'))
+        if checkoverlap and site is not None:
+            filenames = check_overlap(filenames, site)
+        if len(filenames) == 0:
+            raise Exception("No LAS files found")
+        _lasfile_cache[key] = filenames
+    return list(_lasfile_cache[key])
 
 
 def find_classified_lasfile(lasdir='', site=None, params=('1', '3')):
     """ Locate LAS files within vector or given and/or matching classification parameters """
     bname = '' if site is None else site.Basename() + '_'
     slope, cellsize = params[0], params[1]
-    pattern = bname + class_suffix(slope, cellsize)
-    filenames = glob.glob(os.path.join(lasdir, pattern))
-    if len(filenames) == 0:
-        raise Exception("No classified LAS files found")
-    return filenames
+    key = (os.path.abspath(lasdir), bname, str(slope), str(cellsize))
+    if key not in _lasfile_cache:
+        pattern = bname + class_suffix(slope, cellsize)
+        filenames = glob.glob(os.path.join(lasdir, pattern))
+        if len(filenames) == 0:
+            raise Exception("No classified LAS files found")
+        _lasfile_cache[key] = filenames
+    return list(_lasfile_cache[key])
+
+
+def iter_las_points(filename, classification=None, chunk=2000000):
+    """ Stream points from a LAS file in chunks, optionally filtered by classification """
+    from laspy import file as lasfile
+    f = lasfile.File(filename, mode='r')
+    try:
+        # the point records are backed by laspy's memory map, so slicing
+        # reads only the bytes of the current chunk instead of the whole file
+        points = f.points
+        for i in range(0, len(points), chunk):
+            pts = points[i:i + chunk]
+            if classification is not None:
+                cls = pts['point']['raw_classification'] & 31
+                pts = pts[cls == classification]
+            yield pts
+    finally:
+        f.close()
 
 
 # Image processing utilities
@@ -137,26 +169,31 @@ def create_chm(dtm, dsm, chm):
     dsm_arr = dsm_img[0].Read()
     dtm_arr = dtm_img[0].Read()
 
-    # ensure same size arrays, clip to smallest
-    s1 = dsm_arr.shape
-    s2 = dtm_arr.shape
-    if s1 != s2:
-        if s1[0] > s2[0]:
-            dsm_arr = dsm_arr[0:s2[0], :]
-        elif s2[0] > s1[0]:
-            dtm_arr = dtm_arr[0:s1[0], :]
-        if s1[1] > s2[1]:
-            dsm_arr = dsm_arr[:, 0:s2[1]]
-        elif s2[1] > s1[1]:
-            dtm_arr = dtm_arr[:, 0:s1[1]]
-
-    arr = dsm_arr - dtm_arr
-
-    # set to nodata if no ground pixel
-    arr[dtm_arr == dtm_nodata] = nodata
-    # set to nodata if no surface pixel
-    locs = numpy.where(dsm_arr == dsm_nodata)
-    arr[locs] = nodata
+    # ensure same size arrays, clip to smallest common window
+    h = min(dsm_arr.shape[0], dtm_arr.shape[0])
+    w = min(dsm_arr.shape[1], dtm_arr.shape[1])
+    dsm_arr = dsm_arr[:h, :w]
+    dtm_arr = dtm_arr[:h, :w]
+
+    # compute nodata masks in the source dtype - after a downcast the
+    # comparison could miss nodata values not representable in float32 -
+    # and before the in-place subtract clobbers the DSM
+    dtm_mask = dtm_arr == dtm_nodata
+    dsm_mask = dsm_arr == dsm_nodata
+
+    # work in float32 - half the bytes per pixel of float64 and ample
+    # precision for canopy heights
+    if dsm_arr.dtype == numpy.float64:
+        dsm_arr = dsm_arr.astype(numpy.float32)
+    if dtm_arr.dtype == numpy.float64:
+        dtm_arr = dtm_arr.astype(numpy.float32)
+
+    # difference in place, reusing the DSM buffer
+    arr = numpy.subtract(dsm_arr, dtm_arr, out=dsm_arr)
+
+    # set to nodata wherever either ground or surface pixel is missing
+    bad = numpy.logical_or(dtm_mask, dsm_mask)
+    numpy.copyto(arr, nodata, where=bad)
 
     imgout[0].Write(arr)
     return imgout.Filename()
@@ -165,7 +202,6 @@ def create_chm(dtm, dsm, chm):
 def gap_fill(filenames, fout, site=None, interpolation='nearest'):
     """ Gap fill from higher radius DTMs, then fill remainder with interpolation """
     start = datetime.now()
-    from scipy.interpolate import griddata
     if len(filenames) == 0:
         raise Exception('No filenames provided!')
 
@@ -174,14 +210,46 @@ def gap_fill(filenames, fout, site=None, interpolation='nearest'):
     nodata = imgs[0][0].NoDataValue()
     arr = imgs[0][0].Read()
 
+    # nodata mask, recomputed into the same buffer after each merge pass
+    mask = numpy.empty(arr.shape, dtype=bool)
+    numpy.equal(arr, nodata, out=mask)
     for i in range(1, imgs.size()):
-        locs = numpy.where(arr == nodata)
-        arr[locs] = imgs[i][0].Read()[locs]
-
-    # interpolation at bad points
-    goodlocs = numpy.where(arr != nodata)
-    badlocs = numpy.where(arr == nodata)
-    arr[badlocs] = griddata(goodlocs, arr[goodlocs], badlocs, method=interpolation)
+        # all gaps filled - no need to decode the remaining rasters
+        if not mask.any():
+            break
+        # write only where still nodata, without materializing index arrays
+        numpy.copyto(arr, imgs[i][0].Read(), where=mask)
+        numpy.equal(arr, nodata, out=mask)
+
+    # interpolation at bad points - skipped entirely when the merge
+    # already gave complete coverage
+    if not mask.any():
+        pass
+    elif interpolation == 'nearest':
+        # nearest-neighbor fill via distance transform - linear-time raster
+        # sweep instead of triangulating over every valid pixel
+        from scipy.ndimage import distance_transform_edt
+        iy, ix = distance_transform_edt(mask, return_distances=False, return_indices=True)
+        arr[mask] = arr[iy[mask], ix[mask]]
+    else:
+        # inverse-distance weighting from the k nearest valid pixels - the
+        # work scales with the number of gaps rather than triangulating
+        # the whole raster as griddata would
+        from scipy.spatial import cKDTree
+        goodlocs = numpy.where(~mask)
+        goodvals = arr[goodlocs]
+        tree = cKDTree(numpy.column_stack(goodlocs))
+        badpts = numpy.column_stack(numpy.where(mask))
+        k = min(8, goodvals.size)
+        # query in tiles to cap the size of the distance/index arrays
+        tilesize = 1000000
+        for i0 in range(0, badpts.shape[0], tilesize):
+            tile = badpts[i0:i0 + tilesize]
+            dist, idx = tree.query(tile, k=k)
+            if k == 1:
+                dist, idx = dist[:, None], idx[:, None]
+            w = 1.0 / (dist ** 2 + 1e-9)
+            arr[tile[:, 0], tile[:, 1]] = (w * goodvals[idx]).sum(axis=1) / w.sum(axis=1)
 
     # write output
     imgout = gippy.GeoImage(fout, imgs[0])
@@ -204,7 +272,7 @@ def gap_fill(filenames, fout, site=None, interpolation='nearest'):
             os.remove(fout)
             os.rename(_fout, fout)
 
-    print 'Completed gap-filling to create %s in %s' % (os.path.relpath(fout), datetime.now() - start)
+    log.info('Completed gap-filling to create %s in %s' % (os.path.relpath(fout), datetime.now() - start))
 
     return fout
 
@@ -216,29 +284,35 @@ def create_vrt(filenames, fout, site=[None], overwrite=False, verbose=False):
     """ Combine filenames into single file and align if given site """
     if os.path.exists(fout) and not overwrite:
         return fout
-    cmd = [
-        'gdalbuildvrt',
-    ]
-    if not verbose:
-        cmd.append('-q')
+    if len(filenames) == 1 and site[0] is None:
+        # a single input with no site clipping needs no VRT at all
+        if os.path.lexists(fout):
+            os.remove(fout)
+        os.symlink(os.path.abspath(filenames[0]), fout)
+        return fout
+    from osgeo import gdal
+    bounds = None
     if site[0] is not None:
         bounds = get_vector_bounds(site)
-        cmd.append('-te %s' % (' '.join(map(str, bounds))))
-    cmd.append(fout)
-    cmd = cmd + filenames
     if verbose:
-        print 'Combining %s files into %s' % (len(filenames), fout)
-    # print ' '.join(cmd)
-    # subprocess.check_output(cmd)
-    os.system(' '.join(cmd))
+        log.info('Combining %s files into %s' % (len(filenames), fout))
+    # same implementation as the gdalbuildvrt tool, without the subprocess
+    vrt = gdal.BuildVRT(fout, filenames, options=gdal.BuildVRTOptions(outputBounds=bounds))
+    # GDAL signals failure by returning no dataset
+    if vrt is None:
+        raise Exception("Error creating VRT %s" % fout)
+    vrt = None
     return fout
 
 
-def create_hillshade(filename):
-    """ Create hillshade image from this file """
+def create_hillshade(filename, ds=None):
+    """ Create hillshade image from this file, or from an open dataset """
     fout = os.path.splitext(filename)[0] + '_hillshade.tif'
-    sys.stdout.write('Creating hillshade: ')
-    sys.stdout.flush()
-    cmd = 'gdaldem hillshade %s %s' % (filename, fout)
-    os.system(cmd)
+    log.info('Creating hillshade %s' % os.path.relpath(fout))
+    from osgeo import gdal
+    out = gdal.DEMProcessing(fout, filename if ds is None else ds, 'hillshade')
+    # GDAL signals failure by returning no dataset
+    if out is None:
+        raise Exception("Error creating hillshade %s" % fout)
+    out = None
     return fout
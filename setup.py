@@ -44,7 +44,7 @@ for f in glob.glob('l2d/scripts/*.py'):
         if name not in ['__init__']:
             scripts.append('l2d_%s = l2d.scripts.%s:main' % (name, name.lower()))
     except:
-        print traceback.format_exc()
+        print(traceback.format_exc())
 
 setup(
     name='lidar2dems',